@@ -3,27 +3,32 @@ from dotenv import load_dotenv
 from report_generator import generate_sales_report, setup_logging
 import logging
 
+logger = logging.getLogger(__name__)
+
+# Load environment variables from .env file once, at import, and resolve the configuration from them
+load_dotenv()
+SALES_DATA_FILE = os.getenv("SALES_DATA_FILE")
+OUTPUT_REPORT_DIR = os.getenv("OUTPUT_REPORT_DIR")
+WRITE_XLSX = os.getenv("OUTPUT_XLSX", "1") != "0" # Set OUTPUT_XLSX=0 to skip the Excel report
+
 def main(): # Main function to run the sales report generation process
     # Set up logging to capture all messages
     setup_logging()
-
-    logging.info("Loading environment variables...")
-    load_dotenv()     # Load environment variables from .env file
-    logging.info("Environment variables loaded successfully.")
+    logger.info("Environment variables loaded successfully.")
 
     # Get configuration from environment variables
-    sales_data_file = os.getenv("SALES_DATA_FILE")
-    output_report_dir = os.getenv("OUTPUT_REPORT_DIR")
+    sales_data_file = SALES_DATA_FILE
+    output_report_dir = OUTPUT_REPORT_DIR
 
     if not sales_data_file or not output_report_dir:
-        logging.error("Missing required environment variables. "
-                      "Please ensure SALES_DATA_FILE and OUTPUT_REPORT_DIR are set in your .env file.")
+        logger.error("Missing required environment variables. "
+                     "Please ensure SALES_DATA_FILE and OUTPUT_REPORT_DIR are set in your .env file.")
         return
 
-    logging.info(f"Configuration loaded: Sales Data File='{sales_data_file}', Output Directory='{output_report_dir}'")
+    logger.info("Configuration loaded: Sales Data File='%s', Output Directory='%s'", sales_data_file, output_report_dir)
 
     # Run the report generation process
-    generate_sales_report(sales_data_file, output_report_dir)
+    generate_sales_report(sales_data_file, output_report_dir, WRITE_XLSX)
 
 if __name__ == "__main__":
     main()
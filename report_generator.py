@@ -1,94 +1,503 @@
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import atexit
+import csv
+import hashlib
+import io
+import json
 import os
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Iterable, Iterator, Optional
+from numba import njit, prange, get_num_threads, types
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+from pandas.api.types import union_categoricals
+
+logger = logging.getLogger(__name__)
 
 # --- Configuration and Setup ---
 
+# Known schema of the sales CSV, so the reader never has to infer column types.
+# Text columns are dictionary-encoded while parsing, so they arrive in pandas as categoricals.
+SALES_SCHEMA = pa.schema([
+    ('TransactionID', pa.int64()),
+    ('Date', pa.timestamp('ns')),
+    ('ProductName', pa.dictionary(pa.int32(), pa.string())),
+    ('Category', pa.dictionary(pa.int32(), pa.string())),
+    ('Region', pa.dictionary(pa.int32(), pa.string())),
+    ('Quantity', pa.float64()), # Fractional quantities are valid; cleaning narrows whole ones to int32
+    ('UnitPrice', pa.float64()), # Money stays float64: float32 keeps only ~7 significant digits
+    ('TotalPrice', pa.float64()),
+    ('SalespersonID', pa.dictionary(pa.int32(), pa.string())),
+])
+
+# Date formats accepted without falling back to text (month-first, as pd.to_datetime assumes)
+DATE_FORMATS = [pacsv.ISO8601, '%m/%d/%Y', '%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%Y/%m/%d']
+
+# Fallback for files with malformed IDs, dates or numbers: those columns are read as text. Dates and numbers
+# are coerced during cleaning; non-numeric transaction IDs are kept as text.
+LENIENT_SALES_SCHEMA = pa.schema([
+    (field.name, pa.string()) if field.name in ('TransactionID', 'Date', 'Quantity', 'UnitPrice', 'TotalPrice')
+    else field
+    for field in SALES_SCHEMA
+])
+
+# Columns used by the cleaning and aggregation steps; anything else in the CSV is skipped at parse time
+REPORT_COLUMNS = SALES_SCHEMA.names
+
+# Files at least this large are cleaned and aggregated chunk by chunk instead of being loaded whole
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+# Bytes of CSV parsed into each chunk when streaming
+CHUNK_BLOCK_SIZE = 64 * 1024 * 1024
+
+# Cleaned frames are cached here as Arrow IPC files so reruns only parse rows appended since the last run
+CACHE_DIR = "cache"
+# Bump whenever clean_and_process_data changes what it produces, so caches built by older code are rebuilt
+CACHE_VERSION = 2
+
+# Set once setup_logging has run, so later calls return before any filesystem or handler work
+_LOGGING_CONFIGURED = False
+
 def setup_logging():
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    _LOGGING_CONFIGURED = True
+
+    root_logger = logging.getLogger()
+    if root_logger.hasHandlers(): # Configured elsewhere; adding handlers again would duplicate every line
+        return
+
     log_dir = "logs"
     os.makedirs(log_dir, exist_ok=True) # Ensure logs directory exists
     log_file_path = os.path.join(log_dir, "automation.log")
 
-    logging.basicConfig(
-        level=logging.INFO, # Set the minimum level of messages to log
-        format='%(asctime)s - %(levelname)s - %(message)s', # Format of log messages
-        handlers=[
-            logging.FileHandler(log_file_path), # Log to a file
-            logging.StreamHandler() # Log to console as well
-        ]
-    )
-    logging.info("Logging setup complete.")
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s') # Format of log messages
+    handlers = [
+        RotatingFileHandler(log_file_path, maxBytes=10 * 1024 * 1024, backupCount=5), # Log to a file, rotated at 10 MB
+        logging.StreamHandler() # Log to console as well
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # The file and console handlers run on a background thread, so disk writes never stall the pipeline
+    log_queue = queue.Queue()
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop) # Flush any queued records on exit
+
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(logging.INFO) # Set the minimum level of messages to log
+    logger.info("Logging setup complete.")
 
 # --- Core Business Logic Functions ---
 
-def load_sales_data(file_path: str) -> pd.DataFrame:
-    logging.info(f"Attempting to load sales data from: {file_path}")
+def arrow_to_pandas_dtype(arrow_type: pa.DataType):
+    # Keep columns Arrow-backed (contiguous buffers, no Python objects per value). Dictionary columns
+    # are left to pyarrow's default conversion, which reuses the Arrow dictionary as a pandas Categorical.
+    return None if pa.types.is_dictionary(arrow_type) else pd.ArrowDtype(arrow_type)
+
+def read_csv_header(file_path: str) -> list:
+    # utf-8-sig drops a leading byte order mark, as the Arrow reader does, so the first column name matches
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), []) # Empty list if the file is empty
+
+class BoundedReader(io.RawIOBase):
+    # Read-only view of a binary file that stops after limit bytes, so a parse covers exactly the
+    # bytes a caller has accounted for even if the file keeps growing underneath it
+    def __init__(self, f, limit: int):
+        self.f = f
+        self.remaining = limit
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.remaining)
+        if n <= 0:
+            return 0
+        read = self.f.readinto(memoryview(buffer)[:n])
+        self.remaining -= read
+        return read
+
+def read_sales_csv(file_path: str, header: list, offset: int = 0, end: Optional[int] = None) -> pd.DataFrame:
+    # Parses the CSV from byte offset onwards (0 reads the whole file, header row included),
+    # stopping at byte end when it is given.
+    # If a date or number doesn't parse under SALES_SCHEMA, the file is re-read with those columns
+    # as text so clean_and_process_data can coerce the bad values instead of the load failing.
+    read_options = pacsv.ReadOptions(column_names=header) if offset else pacsv.ReadOptions()
+    for schema in (SALES_SCHEMA, LENIENT_SALES_SCHEMA):
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            source = f if end is None else BoundedReader(f, end - offset)
+            try:
+                table = pacsv.read_csv(source, read_options=read_options, convert_options=sales_convert_options(header, schema))
+                break
+            except pa.ArrowInvalid as e:
+                if schema is LENIENT_SALES_SCHEMA:
+                    raise
+                logger.warning("Malformed values in %s (%s). Re-reading IDs, dates and numbers as text.", file_path, e)
+    return table.to_pandas(types_mapper=arrow_to_pandas_dtype, split_blocks=True, self_destruct=True)
+
+def sales_convert_options(header: list, schema: pa.Schema = SALES_SCHEMA) -> pacsv.ConvertOptions:
+    return pacsv.ConvertOptions(
+        column_types=schema,
+        strings_can_be_null=True, # Empty strings become nulls so cleaning can fill them
+        timestamp_parsers=DATE_FORMATS,
+        include_columns=[col for col in header if col in REPORT_COLUMNS] # Only parse the columns we report on
+    )
+
+def load_sales_data(file_path: str, end: Optional[int] = None) -> pd.DataFrame:
+    # end, when given, limits the read to the first end bytes of the file
+    logger.info("Attempting to load sales data from: %s", file_path)
     if not os.path.exists(file_path):
-        logging.error(f"Error: Sales data file not found at {file_path}")
+        logger.error("Error: Sales data file not found at %s", file_path)
         raise FileNotFoundError(f"Sales data file not found: {file_path}")
     try:
-        df = pd.read_csv(file_path)
-        logging.info(f"Successfully loaded {len(df)} records from {file_path}")
+        header = read_csv_header(file_path)
+        if not header:
+            logger.warning("The CSV file at %s is empty.", file_path)
+            return pd.DataFrame() # Return an empty DataFrame if file is empty
+
+        df = read_sales_csv(file_path, header, end=end) # Multithreaded Arrow CSV reader
+        logger.info("Successfully loaded %s records from %s", len(df), file_path)
         return df
-    except pd.errors.EmptyDataError:
-        logging.warning(f"The CSV file at {file_path} is empty.")
-        return pd.DataFrame() # Return an empty DataFrame if file is empty
-    except Exception as e:
-        logging.error(f"An unexpected error occurred while reading {file_path}: {e}")
+    except (OSError, pa.ArrowInvalid) as e: # Unreadable file or rows that don't match SALES_SCHEMA
+        logger.error("An unexpected error occurred while reading %s: %s", file_path, e)
         raise # Re-raise the exception after logging
 
+def load_sales_data_in_chunks(file_path: str, block_size: int = CHUNK_BLOCK_SIZE,
+                              schema: pa.Schema = SALES_SCHEMA) -> Iterator[pd.DataFrame]:
+    # Yields the file as consecutive DataFrames of roughly block_size bytes of CSV each,
+    # so only one chunk is held in memory at a time. Raises pa.ArrowInvalid at the first chunk
+    # with a value that doesn't parse under schema (see aggregate_sales_file_in_chunks).
+    logger.info("Streaming sales data from: %s", file_path)
+    if not os.path.exists(file_path):
+        logger.error("Error: Sales data file not found at %s", file_path)
+        raise FileNotFoundError(f"Sales data file not found: {file_path}")
+    header = read_csv_header(file_path)
+    if not header:
+        logger.warning("The CSV file at %s is empty.", file_path)
+        return
+
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=block_size),
+        convert_options=sales_convert_options(header, schema)
+    )
+    num_records = 0
+    for batch in reader:
+        num_records += batch.num_rows
+        yield batch.to_pandas(types_mapper=arrow_to_pandas_dtype, split_blocks=True, self_destruct=True)
+    logger.info("Successfully streamed %s records from %s", num_records, file_path)
+
 def clean_and_process_data(df: pd.DataFrame) -> pd.DataFrame:
-    logging.info("Starting data cleaning and processing...")
+    # Reassigns columns of df, so callers should not reuse the frame they pass in
+    logger.info("Starting data cleaning and processing...")
 
     if df.empty:
-        logging.warning("No data to process. Returning empty DataFrame.")
+        logger.warning("No data to process. Returning empty DataFrame.")
         return df
 
     # Convert 'Date' column to datetime objects
     if 'Date' in df.columns:
         df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        # Drop rows where Date conversion failed
-        df.dropna(subset=['Date'], inplace=True)
-        logging.info("Converted 'Date' column to datetime.")
+        # Drop rows where Date conversion failed, slicing once with a mask instead of an inplace dropna
+        keep = df['Date'].notna()
+        if not keep.all():
+            df = df.loc[keep].reset_index(drop=True)
+            # Categoricals read from the CSV still list values that only appeared on dropped rows
+            for col in df.columns:
+                if isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].cat.remove_unused_categories()
+        logger.info("Converted 'Date' column to datetime.")
     else:
-        logging.warning("Date column not found. Skipping date conversion.")
+        logger.warning("Date column not found. Skipping date conversion.")
+
+    # IDs read as text by the lenient fallback go back to integers when every one is numeric, so they
+    # match a strict read of the same rows ("01" and 1 are one transaction)
+    if 'TransactionID' in df.columns and pd.api.types.is_string_dtype(df['TransactionID']):
+        try:
+            df['TransactionID'] = df['TransactionID'].astype(pd.ArrowDtype(pa.int64()))
+        except pa.ArrowInvalid:
+            pass # Genuinely textual IDs such as 'T1' are kept as text
 
     # Ensure numeric columns are of the correct type
     numeric_cols = ['Quantity', 'UnitPrice', 'TotalPrice']
-    for col in numeric_cols:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-            # Fill NaN created by coercion with 0, or drop rows if critical
-            df[col].fillna(0, inplace=True)
-            logging.info(f"Ensured '{col}' column is numeric and handled NaNs.")
-        else:
-            logging.warning(f"Numeric column '{col}' not found. Skipping type conversion.")
+    present_numeric = [col for col in numeric_cols if col in df.columns]
+    missing_numeric = [col for col in numeric_cols if col not in df.columns]
+    # Coerce in one block-level pass. The float64 cast matters for Arrow-backed text columns: there
+    # to_numeric marks bad values as NaN, which Arrow doesn't treat as missing, so fillna would skip them.
+    df[present_numeric] = df[present_numeric].apply(pd.to_numeric, errors='coerce').astype('float64')
+    if missing_numeric:
+        logger.warning("Numeric columns %s not found. Skipping type conversion.", missing_numeric)
 
-    # Handle missing values in categorical columns (e.g., fill with 'Unknown')
+    # Missing values in categorical columns are filled with 'Unknown'
     categorical_cols = ['ProductName', 'Category', 'Region', 'SalespersonID']
-    for col in categorical_cols:
-        if col in df.columns:
-            df[col].fillna('Unknown', inplace=True)
-            logging.info(f"Filled missing values in '{col}' with 'Unknown'.")
-        else:
-            logging.warning(f"Categorical column '{col}' not found. Skipping NaN handling.")
+    present_categorical = [col for col in categorical_cols if col in df.columns]
+    missing_categorical = [col for col in categorical_cols if col not in df.columns]
+    if missing_categorical:
+        logger.warning("Categorical columns %s not found. Skipping NaN handling.", missing_categorical)
+    for col in present_categorical:
+        # Columns read as categoricals can only be filled with an existing category, so add 'Unknown'
+        # (only where needed, to avoid an empty 'Unknown' group in the reports)
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and 'Unknown' not in df[col].cat.categories \
+                and df[col].isna().any():
+            df[col] = df[col].cat.add_categories('Unknown')
+
+    # Fill NaN (including those created by coercion) in every column with a single dict-based fillna
+    fill_map = {col: 0 for col in present_numeric} | {col: 'Unknown' for col in present_categorical}
+    df = df.fillna(fill_map)
+    logger.info("Ensured columns %s are numeric and handled NaNs.", present_numeric)
+    logger.info("Filled missing values in %s with 'Unknown'.", present_categorical)
+
+    # Narrow Quantity to int32 when every value is whole (fractional quantities stay float64), and store
+    # categorical columns as integer codes so later groupbys don't hash Python strings. Prices stay
+    # float64, since float32 can't hold large money values to the cent.
+    downcast_types = {col: 'category' for col in present_categorical}
+    if 'Quantity' in present_numeric:
+        downcast_types['Quantity'] = 'int32' if (df['Quantity'] % 1 == 0).all() else 'float64'
+    df = df.astype(downcast_types)
+
+    logger.info("Data cleaning and processing complete.")
+    return df[[col for col in REPORT_COLUMNS if col in df.columns]] # New frame holding only the columns the reports use
+
+def cache_fingerprint() -> str:
+    # Identifies the code that produced a cache: its version plus the schema and date formats the CSV is read with
+    date_formats = ['ISO8601' if fmt is pacsv.ISO8601 else fmt for fmt in DATE_FORMATS] # ISO8601's repr is its address
+    source = f"{CACHE_VERSION}|{SALES_SCHEMA.to_string()}|{LENIENT_SALES_SCHEMA.to_string()}|{date_formats}"
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=16).hexdigest()
+
+def update_file_hash(digest, file_path: str, start: int, end: int):
+    # Feeds bytes start..end of the file into digest, used to tell an append from an in-place edit.
+    # Callers hash the cached prefix, then keep the same digest going over the appended bytes.
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(remaining, 1024 * 1024))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+
+def cleaned_cache_path(file_path: str, cache_dir: str) -> str:
+    # Keyed on the absolute path, so same-named CSVs in different folders don't share a cache
+    path_key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=8).hexdigest()
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{path_key}.cleaned.arrow")
+
+def read_cleaned_cache(cache_path: str):
+    # Returns (cleaned frame, metadata describing the CSV prefix it covers), or None if there is no usable cache
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        table = feather.read_table(cache_path, memory_map=True) # Memory-mapped, no parsing
+        metadata = table.schema.metadata
+        if metadata.get(b'cache_fingerprint', b'').decode('utf-8') != cache_fingerprint():
+            logger.info("Cache %s was built by an older version of the cleaning code. Rebuilding cache.", cache_path)
+            return None
+        csv_state = {
+            'bytes': int(metadata[b'csv_bytes']),
+            'mtime_ns': int(metadata[b'csv_mtime_ns']),
+            'prefix_hash': metadata[b'csv_prefix_hash'].decode('utf-8'),
+            'header': json.loads(metadata[b'csv_header']),
+        }
+        return table.to_pandas(), csv_state
+    except (OSError, KeyError, ValueError, pa.ArrowInvalid) as e:
+        logger.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+        return None
+
+def write_cleaned_cache(cache_path: str, df: pd.DataFrame, csv_state: dict):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True) # Ensure cache directory exists
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **table.schema.metadata,
+        b'cache_fingerprint': cache_fingerprint().encode('utf-8'),
+        b'csv_bytes': str(csv_state['bytes']).encode('utf-8'),
+        b'csv_mtime_ns': str(csv_state['mtime_ns']).encode('utf-8'),
+        b'csv_prefix_hash': csv_state['prefix_hash'].encode('utf-8'),
+        b'csv_header': json.dumps(csv_state['header']).encode('utf-8'),
+    })
+    try:
+        feather.write_feather(table, cache_path, compression='zstd')
+        logger.info("Cached %s cleaned records to %s", len(df), cache_path)
+    except (OSError, pa.ArrowException) as e:
+        logger.warning("Could not write cache %s: %s", cache_path, e) # The report itself is unaffected
 
-    logging.info("Data cleaning and processing complete.")
+def append_cleaned_rows(cached_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    cat_cols = [col for col in cached_df.columns if isinstance(cached_df[col].dtype, pd.CategoricalDtype)]
+    cached_rest, new_rest = cached_df.drop(columns=cat_cols), new_df.drop(columns=cat_cols)
+    for col in cached_rest.columns:
+        # Only genuinely textual IDs (cleaning turns numeric text back into int64) make one side text;
+        # then the file has text IDs, and every ID is compared as text, as a full re-read would
+        if cached_rest[col].dtype != new_rest[col].dtype and \
+                (pd.api.types.is_string_dtype(cached_rest[col]) or pd.api.types.is_string_dtype(new_rest[col])):
+            cached_rest[col] = cached_rest[col].astype(pd.ArrowDtype(pa.string()))
+            new_rest[col] = new_rest[col].astype(pd.ArrowDtype(pa.string()))
+    combined = pd.concat([cached_rest, new_rest], ignore_index=True)
+    for col in cat_cols:
+        # Merge the small category dictionaries and remap codes instead of re-encoding every string.
+        # Category labels are normalised to str first, since the cache and the CSV reader type them differently.
+        parts = [part[col].cat.rename_categories(part[col].cat.categories.astype(str)) for part in (cached_df, new_df)]
+        combined[col] = union_categoricals(parts, ignore_order=True)
+    return combined[list(cached_df.columns)]
+
+def load_cleaned_sales_data(file_path: str, cache_dir: str = CACHE_DIR) -> pd.DataFrame:
+    # Cleaned sales data, reusing the cache from the previous run. The CSV is assumed to be append-only:
+    # if it only grew and the bytes the cache covers are unchanged, just the new bytes are parsed and
+    # cleaned; any other change rebuilds the cache.
+    if not os.path.exists(file_path):
+        return load_sales_data(file_path) # Logs and raises FileNotFoundError
+    cache_path = cleaned_cache_path(file_path, cache_dir)
+    # Size and mtime are taken once, up front; every read below stops at this size, so rows appended
+    # while this run is reading are left for the next run instead of being counted twice
+    stat = os.stat(file_path)
+    header = read_csv_header(file_path)
+    csv_state = {'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'prefix_hash': None, 'header': header}
+
+    cached = read_cleaned_cache(cache_path)
+    if cached is not None:
+        cached_df, cached_state = cached
+        if cached_state['header'] == header and cached_state['bytes'] == stat.st_size \
+                and cached_state['mtime_ns'] == stat.st_mtime_ns:
+            logger.info("Loaded %s cleaned records from cache %s", len(cached_df), cache_path)
+            return cached_df
+        # The file was modified: reuse the cache only if the part it covers is byte-for-byte unchanged
+        digest = hashlib.blake2b(digest_size=16)
+        prefix_unchanged = False
+        if cached_state['header'] == header and cached_state['bytes'] <= stat.st_size:
+            update_file_hash(digest, file_path, 0, cached_state['bytes'])
+            prefix_unchanged = digest.hexdigest() == cached_state['prefix_hash']
+        if prefix_unchanged:
+            update_file_hash(digest, file_path, cached_state['bytes'], stat.st_size)
+            csv_state['prefix_hash'] = digest.hexdigest()
+            if cached_state['bytes'] == stat.st_size: # Touched but not changed
+                df = cached_df
+            else:
+                logger.info("Reading rows appended to %s since the cached run", file_path)
+                new_df = clean_and_process_data(
+                    read_sales_csv(file_path, header, offset=cached_state['bytes'], end=stat.st_size)
+                )
+                df = append_cleaned_rows(cached_df, new_df) if not new_df.empty else cached_df
+            write_cleaned_cache(cache_path, df, csv_state)
+            return df
+        logger.info("Sales data file %s changed since it was cached. Rebuilding cache.", file_path)
+
+    df = clean_and_process_data(load_sales_data(file_path, end=stat.st_size))
+    if not df.empty:
+        digest = hashlib.blake2b(digest_size=16)
+        update_file_hash(digest, file_path, 0, stat.st_size)
+        csv_state['prefix_hash'] = digest.hexdigest()
+        write_cleaned_cache(cache_path, df, csv_state)
     return df
 
-def aggregate_sales_data(df: pd.DataFrame) -> dict:
-    logging.info("Aggregating sales data for various reports...")
-    reports = {}
+# Inputs are typed read-only because pandas hands out read-only views under copy-on-write.
+# Pinning the signature compiles the kernel once at import instead of on the first report.
+PRICES_ARRAY = types.Array(types.float64, 1, 'A', readonly=True)
+CODES_ARRAY = types.Array(types.int32, 1, 'A', readonly=True)
+FUSED_SUMS_SIGNATURE = types.UniTuple(types.float64[:], 3)(
+    PRICES_ARRAY, CODES_ARRAY, CODES_ARRAY, CODES_ARRAY, types.int64, types.int64, types.int64, types.int64
+)
 
-    if df.empty:
-        logging.warning("No data to aggregate. Returning empty reports.")
-        return reports
+@njit(FUSED_SUMS_SIGNATURE, parallel=True, cache=True)
+def fused_revenue_sums(prices, category_codes, region_codes, product_codes,
+                       n_categories, n_regions, n_products, n_threads):
+    # One sweep over the prices scatter-adds into the category, region and product buckets at once.
+    # Each thread fills its own row of partial sums, which are reduced at the end to avoid contention.
+    # n_threads is passed in rather than read inside the kernel, which would stop numba caching it.
+    step = (prices.size + n_threads - 1) // n_threads
+    category_partials = np.zeros((n_threads, n_categories))
+    region_partials = np.zeros((n_threads, n_regions))
+    product_partials = np.zeros((n_threads, n_products))
+    for t in prange(n_threads):
+        for i in range(t * step, min((t + 1) * step, prices.size)):
+            price = prices[i]
+            if category_codes[i] >= 0:
+                category_partials[t, category_codes[i]] += price
+            if region_codes[i] >= 0:
+                region_partials[t, region_codes[i]] += price
+            if product_codes[i] >= 0:
+                product_partials[t, product_codes[i]] += price
+    return category_partials.sum(axis=0), region_partials.sum(axis=0), product_partials.sum(axis=0)
+
+def category_codes(df: pd.DataFrame, col: str):
+    # Integer codes and labels of a categorical column; a missing column yields no groups
+    if col not in df.columns:
+        return np.full(len(df), -1, dtype=np.int32), pd.Index([])
+    values = df[col] if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].astype('category')
+    return values.cat.codes.to_numpy(dtype=np.int32), values.cat.categories
+
+def unique_transaction_ids(ids: pd.Series):
+    # Integer IDs use NumPy's sort-based unique; text IDs stay in an Arrow array rather than
+    # becoming an object array of Python strings
+    ids = ids.dropna()
+    if pd.api.types.is_string_dtype(ids):
+        return pc.unique(pa.array(ids))
+    return np.unique(ids.to_numpy())
+
+def count_unique_transaction_ids(id_arrays: list) -> int:
+    if all(isinstance(ids, np.ndarray) for ids in id_arrays):
+        return len(id_arrays[0] if len(id_arrays) == 1 else np.unique(np.concatenate(id_arrays)))
+    # Some chunks had text IDs, so every chunk's IDs are compared as text
+    as_text = [pa.array(ids).cast(pa.string()) for ids in id_arrays]
+    return len(pc.unique(pa.chunked_array(as_text, type=pa.string())))
+
+def summarize_sales_data(df: pd.DataFrame) -> dict:
+    # Additive totals behind every report, so the totals of separate chunks can be merged
+    # Summary sums straight off the column arrays with 64-bit accumulators, so the int32 Quantity is not
+    # widened into a copy first
+    quantities = df['Quantity'].to_numpy()
+    totals = {
+        'TotalRevenue': df['TotalPrice'].to_numpy().sum(dtype=np.float64),
+        'TotalQuantity': quantities.sum(dtype=np.int64 if np.issubdtype(quantities.dtype, np.integer) else np.float64),
+        # Unique IDs of this frame. Kept as a list of arrays so chunk totals can be merged by
+        # concatenating lists and deduplicated once, in build_sales_reports.
+        'TransactionIDs': [unique_transaction_ids(df['TransactionID'])],
+    }
+
+    # Revenue per category, region and product in a single pass over TotalPrice
+    cat_codes, cat_labels = category_codes(df, 'Category')
+    reg_codes, reg_labels = category_codes(df, 'Region')
+    prod_codes, prod_labels = category_codes(df, 'ProductName')
+    category_sums, region_sums, product_sums = fused_revenue_sums(
+        df['TotalPrice'].to_numpy(dtype=np.float64), cat_codes, reg_codes, prod_codes,
+        len(cat_labels), len(reg_labels), len(prod_labels), get_num_threads()
+    )
+    for col, labels, sums in [('Category', cat_labels, category_sums),
+                              ('Region', reg_labels, region_sums),
+                              ('ProductName', prod_labels, product_sums)]:
+        if col in df.columns:
+            totals[col] = pd.Series(sums, index=labels)
+    return totals
+
+def merge_sales_totals(totals: dict, other: dict) -> dict:
+    merged = {
+        'TotalRevenue': totals['TotalRevenue'] + other['TotalRevenue'],
+        'TotalQuantity': totals['TotalQuantity'] + other['TotalQuantity'],
+        'TransactionIDs': totals['TransactionIDs'] + other['TransactionIDs'],
+    }
+    for col in ['Category', 'Region', 'ProductName']:
+        if col in totals:
+            merged[col] = totals[col].add(other[col], fill_value=0)
+    return merged
+
+def build_sales_reports(totals: dict) -> dict:
+    reports = {}
 
     # Overall Summary
-    total_revenue = df['TotalPrice'].sum()
-    total_quantity = df['Quantity'].sum()
-    num_transactions = df['TransactionID'].nunique()
+    total_revenue = totals['TotalRevenue']
+    total_quantity = totals['TotalQuantity']
+    # Deduplicate IDs across chunks once here; merging with np.union1d per chunk re-sorted every ID so far
+    num_transactions = count_unique_transaction_ids(totals['TransactionIDs'])
     avg_transaction_value = total_revenue / num_transactions if num_transactions > 0 else 0
 
     summary_data = {
@@ -96,92 +505,169 @@ def aggregate_sales_data(df: pd.DataFrame) -> dict:
         'Value': [total_revenue, total_quantity, num_transactions, avg_transaction_value]
     }
     reports['Summary'] = pd.DataFrame(summary_data)
-    logging.info("Generated Sales Summary report.")
+    logger.info("Generated Sales Summary report.")
 
     # Sales by Category
-    if 'Category' in df.columns:
-        sales_by_category = df.groupby('Category')['TotalPrice'].sum().reset_index()
-        sales_by_category.rename(columns={'TotalPrice': 'Total Revenue'}, inplace=True)
+    if 'Category' in totals:
+        sales_by_category = totals['Category'].rename_axis('Category').reset_index(name='Total Revenue')
         reports['Sales by Category'] = sales_by_category.sort_values(by='Total Revenue', ascending=False)
-        logging.info("Generated Sales by Category report.")
+        logger.info("Generated Sales by Category report.")
     else:
-        logging.warning("Category column not found. Skipping 'Sales by Category' report.")
+        logger.warning("Category column not found. Skipping 'Sales by Category' report.")
 
     # Sales by Region
-    if 'Region' in df.columns:
-        sales_by_region = df.groupby('Region')['TotalPrice'].sum().reset_index()
-        sales_by_region.rename(columns={'TotalPrice': 'Total Revenue'}, inplace=True)
+    if 'Region' in totals:
+        sales_by_region = totals['Region'].rename_axis('Region').reset_index(name='Total Revenue')
         reports['Sales by Region'] = sales_by_region.sort_values(by='Total Revenue', ascending=False)
-        logging.info("Generated Sales by Region report.")
+        logger.info("Generated Sales by Region report.")
     else:
-        logging.warning("Region column not found. Skipping 'Sales by Region' report.")
+        logger.warning("Region column not found. Skipping 'Sales by Region' report.")
 
     # Top 5 Products by Revenue
-    if 'ProductName' in df.columns and 'TotalPrice' in df.columns:
-        top_products = df.groupby('ProductName')['TotalPrice'].sum().reset_index()
-        top_products.rename(columns={'TotalPrice': 'Total Revenue'}, inplace=True)
-        reports['Top 5 Products'] = top_products.sort_values(by='Total Revenue', ascending=False).head(5)
-        logging.info("Generated Top 5 Products report.")
+    if 'ProductName' in totals:
+        # Partial selection of the top 5 instead of sorting every product
+        top_products = totals['ProductName'].nlargest(5)
+        reports['Top 5 Products'] = top_products.rename_axis('ProductName').reset_index(name='Total Revenue')
+        logger.info("Generated Top 5 Products report.")
     else:
-        logging.warning("ProductName or TotalPrice column not found. Skipping 'Top 5 Products' report.")
+        logger.warning("ProductName column not found. Skipping 'Top 5 Products' report.")
 
-    logging.info("Sales data aggregation complete.")
     return reports
 
+def aggregate_sales_data(df: pd.DataFrame) -> dict:
+    logger.info("Aggregating sales data for various reports...")
+
+    if df.empty:
+        logger.warning("No data to aggregate. Returning empty reports.")
+        return {}
+
+    reports = build_sales_reports(summarize_sales_data(df))
+    logger.info("Sales data aggregation complete.")
+    return reports
+
+def aggregate_sales_chunks(chunks: Iterable[pd.DataFrame]) -> dict:
+    # Same reports as aggregate_sales_data, built from cleaned chunks. Memory holds one chunk,
+    # the per-group totals and each chunk's unique transaction IDs, never the whole file
+    logger.info("Aggregating streamed sales data for various reports...")
+    totals = None
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk_totals = summarize_sales_data(chunk)
+        totals = chunk_totals if totals is None else merge_sales_totals(totals, chunk_totals)
+
+    if totals is None:
+        logger.warning("No data to aggregate. Returning empty reports.")
+        return {}
+
+    reports = build_sales_reports(totals)
+    logger.info("Sales data aggregation complete.")
+    return reports
+
+def aggregate_sales_file_in_chunks(file_path: str, block_size: int = CHUNK_BLOCK_SIZE) -> dict:
+    # Streams with SALES_SCHEMA. Totals already merged from earlier chunks can't be taken back, so a
+    # malformed value restarts the whole pass with LENIENT_SALES_SCHEMA, as read_sales_csv does for small files.
+    try:
+        chunks = load_sales_data_in_chunks(file_path, block_size)
+        return aggregate_sales_chunks(clean_and_process_data(chunk) for chunk in chunks)
+    except pa.ArrowInvalid as e:
+        logger.warning("Malformed values in %s (%s). Re-streaming IDs, dates and numbers as text.", file_path, e)
+        chunks = load_sales_data_in_chunks(file_path, block_size, LENIENT_SALES_SCHEMA)
+        return aggregate_sales_chunks(clean_and_process_data(chunk) for chunk in chunks)
+
+def write_report_sheet(workbook: Workbook, sheet_name: str, df_report: pd.DataFrame):
+    sheet = workbook.create_sheet(title=sheet_name)
+    header = []
+    for col in df_report.columns:
+        cell = WriteOnlyCell(sheet, value=col)
+        cell.font = Font(bold=True) # Match the header style pandas' to_excel used
+        cell.alignment = Alignment(horizontal='center')
+        header.append(cell)
+    sheet.append(header)
+    for row in df_report.itertuples(index=False, name=None):
+        sheet.append(row)
+
 def save_reports_to_excel(reports: dict, output_dir: str, file_name: str):
     os.makedirs(output_dir, exist_ok=True) # Ensure output directory exists
     output_path = os.path.join(output_dir, file_name)
-    logging.info(f"Attempting to save reports to: {output_path}")
+    logger.info("Attempting to save reports to: %s", output_path)
 
     try:
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            if not reports:
-                logging.warning("No reports to save. Creating an empty Excel file.")
-                # Create a dummy sheet if no reports
-                pd.DataFrame({'Message': ['No data available for reports.']}).to_excel(writer, sheet_name='No Data', index=False)
-            else:
-                for sheet_name, df_report in reports.items():
-                    df_report.to_excel(writer, sheet_name=sheet_name, index=False)
-                    logging.info(f"Sheet '{sheet_name}' saved to Excel.")
-        logging.info(f"Successfully saved all reports to {output_path}")
+        # Write-only mode streams rows to disk instead of building the whole workbook tree in memory.
+        # Sheets are written one after another: they share the workbook's string table and styles,
+        # and XML generation holds the GIL, so writing them from a thread pool would not overlap any work.
+        workbook = Workbook(write_only=True)
+        if not reports:
+            logger.warning("No reports to save. Creating an empty Excel file.")
+            # Create a dummy sheet if no reports
+            write_report_sheet(workbook, 'No Data', pd.DataFrame({'Message': ['No data available for reports.']}))
+        else:
+            for sheet_name, df_report in reports.items():
+                write_report_sheet(workbook, sheet_name, df_report)
+                logger.info("Sheet '%s' saved to Excel.", sheet_name)
+        workbook.save(output_path)
+        logger.info("Successfully saved all reports to %s", output_path)
     except Exception as e:
-        logging.error(f"Error saving reports to Excel file {output_path}: {e}")
+        logger.error("Error saving reports to Excel file %s: %s", output_path, e)
+        raise # Re-raise the exception after logging
+
+def save_reports_to_parquet(reports: dict, output_dir: str, report_date: str):
+    # Columnar copy of each report for downstream readers. Reports have different columns, so each one
+    # is its own dataset (parquet/<Report_Name>/), partitioned by report date below that.
+    parquet_dir = os.path.join(output_dir, "parquet")
+    if not reports:
+        logger.warning("No reports to save. Skipping Parquet output.")
+        return
+    logger.info("Attempting to save reports to: %s", parquet_dir)
+
+    try:
+        for sheet_name, df_report in reports.items():
+            partition_dir = os.path.join(parquet_dir, sheet_name.replace(' ', '_'), f"date={report_date}")
+            os.makedirs(partition_dir, exist_ok=True) # Ensure partition directory exists
+            table = pa.Table.from_pandas(df_report, preserve_index=False)
+            pq.write_table(table, os.path.join(partition_dir, "part-0.parquet"), compression='zstd', use_dictionary=True)
+            logger.info("Report '%s' saved to Parquet.", sheet_name)
+        logger.info("Successfully saved all reports to %s", parquet_dir)
+    except (OSError, pa.ArrowException) as e:
+        logger.error("Error saving reports to Parquet in %s: %s", parquet_dir, e)
         raise # Re-raise the exception after logging
 
 # --- Main Automation Workflow ---
 
-def generate_sales_report(sales_data_file: str, output_report_dir: str):
-    setup_logging()
-    logging.info("Starting Daily Sales Report Generation Automation.")
+def generate_sales_report(sales_data_file: str, output_report_dir: str, write_xlsx: bool = True):
+    # Logging is configured once by the caller (see main.py), not on every run
+    logger.info("Starting Daily Sales Report Generation Automation.")
+    today_date = datetime.now().strftime("%Y-%m-%d")
+    report_file_name = f"Daily_Sales_Report_{today_date}.xlsx"
 
     try:
-        # 1. Load Data
-        raw_df = load_sales_data(sales_data_file)
-        if raw_df.empty:
-            logging.warning("No sales data loaded. Skipping report generation.")
-            # Still create an empty report file to indicate process ran but no data
-            today_date = datetime.now().strftime("%Y-%m-%d")
-            report_file_name = f"Daily_Sales_Report_{today_date}.xlsx"
-            save_reports_to_excel({}, output_report_dir, report_file_name)
-            logging.info("Daily Sales Report Generation Automation finished (no data).")
-            return
-
-        # 2. Clean and Process Data
-        processed_df = clean_and_process_data(raw_df.copy()) # Use a copy to avoid modifying original
-
-        # 3. Aggregate Sales Data
-        aggregated_reports = aggregate_sales_data(processed_df)
-
-        # 4. Save Report
-        today_date = datetime.now().strftime("%Y-%m-%d")
-        report_file_name = f"Daily_Sales_Report_{today_date}.xlsx"
-        save_reports_to_excel(aggregated_reports, output_report_dir, report_file_name)
-
-        logging.info("Daily Sales Report Generation Automation completed successfully.")
+        if os.path.exists(sales_data_file) and os.path.getsize(sales_data_file) >= STREAMING_THRESHOLD_BYTES:
+            # Large file: load, clean and aggregate chunk by chunk instead of holding every row
+            aggregated_reports = aggregate_sales_file_in_chunks(sales_data_file)
+        else:
+            # 1-2. Load, Clean and Process Data, reusing the cleaned cache from the previous run
+            processed_df = load_cleaned_sales_data(sales_data_file)
+            if processed_df.empty:
+                logger.warning("No sales data loaded. Skipping report generation.")
+                # Still create an empty report file to indicate process ran but no data
+                if write_xlsx:
+                    save_reports_to_excel({}, output_report_dir, report_file_name)
+                logger.info("Daily Sales Report Generation Automation finished (no data).")
+                return
+
+            # 3. Aggregate Sales Data
+            aggregated_reports = aggregate_sales_data(processed_df)
+
+        # 4. Save Reports: Parquet for downstream tools, xlsx (when enabled) for people
+        save_reports_to_parquet(aggregated_reports, output_report_dir, today_date)
+        if write_xlsx:
+            save_reports_to_excel(aggregated_reports, output_report_dir, report_file_name)
+
+        logger.info("Daily Sales Report Generation Automation completed successfully.")
 
     except FileNotFoundError as fnfe:
-        logging.error(f"Automation failed: {fnfe}")
+        logger.error("Automation failed: %s", fnfe)
     except pd.errors.EmptyDataError as ede:
-        logging.error(f"Automation failed due to empty data file: {ede}")
+        logger.error("Automation failed due to empty data file: %s", ede)
     except Exception as e:
-        logging.error(f"An unhandled error occurred during automation: {e}", exc_info=True)
\ No newline at end of file
+        logger.error("An unhandled error occurred during automation: %s", e, exc_info=True)
\ No newline at end of file
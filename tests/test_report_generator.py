@@ -0,0 +1,180 @@
+import os
+
+import pandas as pd
+
+import report_generator
+from report_generator import cleaned_cache_path, load_cleaned_sales_data
+
+HEADER = "TransactionID,Date,ProductID,ProductName,Category,Quantity,UnitPrice,TotalPrice,Region\n"
+ROWS = [
+    "1,2024-01-01,P1,Widget,Tools,2,10.00,20.00,North\n",
+    "2,2024-01-02,P2,Gadget,Toys,1,1200,1200,South\n",
+]
+
+def write_csv(path, rows):
+    path.write_text(HEADER + "".join(rows), encoding="utf-8")
+
+def test_unchanged_file_is_served_from_cache(tmp_path, monkeypatch):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    first = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV was re-parsed")
+    monkeypatch.setattr(report_generator, "read_sales_csv", fail)
+    second = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert second["TotalPrice"].tolist() == first["TotalPrice"].tolist()
+
+def test_appended_rows_are_read_incrementally(tmp_path, monkeypatch):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("3,2024-01-03,P1,Widget,Garden,4,10.00,40.00,East\n")
+    offsets = []
+    read_sales_csv = report_generator.read_sales_csv
+    def spy(file_path, header, offset=0, end=None):
+        offsets.append(offset)
+        return read_sales_csv(file_path, header, offset, end)
+    monkeypatch.setattr(report_generator, "read_sales_csv", spy)
+
+    df = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert offsets and all(offset > 0 for offset in offsets)
+    assert df["TransactionID"].tolist() == [1, 2, 3]
+    assert df["Category"].tolist() == ["Tools", "Toys", "Garden"]
+
+def test_same_size_edit_rebuilds_cache(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    write_csv(csv_path, [ROWS[0], ROWS[1].replace("1200,1200", "1300,1300")])
+    df = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert df["TotalPrice"].tolist() == [20.0, 1300.0]
+
+def test_same_name_in_different_folders_uses_separate_caches(tmp_path):
+    first_path, second_path = tmp_path / "a" / "sales.csv", tmp_path / "b" / "sales.csv"
+    first_path.parent.mkdir()
+    second_path.parent.mkdir()
+    write_csv(first_path, ROWS)
+    write_csv(second_path, [ROWS[0].replace("20.00,North", "30.00,North")])
+
+    assert cleaned_cache_path(str(first_path), "cache") != cleaned_cache_path(str(second_path), "cache")
+    load_cleaned_sales_data(str(first_path), str(tmp_path / "cache"))
+    df = load_cleaned_sales_data(str(second_path), str(tmp_path / "cache"))
+    assert df["TotalPrice"].tolist() == [30.0]
+
+def test_appended_text_ids_merge_with_cached_integer_ids(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("T3,2024-01-03,P1,Widget,Tools,oops,10.00,40.00,East\n")
+    df = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert df["TransactionID"].tolist() == ["1", "2", "T3"]
+    assert df["Quantity"].tolist() == [2, 1, 0]
+
+    # The merged frame round-trips through the cache
+    cached = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    pd.testing.assert_frame_equal(cached, df, check_dtype=False, check_categorical=False)
+
+def test_rows_past_the_snapshot_size_are_not_parsed(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("3,2024-01-03,P1,Widget,Garden,4,10.00,40.00,East\n")
+    df = report_generator.load_sales_data(str(csv_path), end=size)
+    assert df["TransactionID"].tolist() == [1, 2]
+
+def write_large_csv(path, num_rows, extra_rows=()):
+    categories, regions = ["Tools", "Toys", "Garden"], ["North", "South", "East", "West"]
+    rows = [
+        f"{i},2024-01-{i % 28 + 1:02d},P{i % 50},Product{i % 50},{categories[i % 3]},{i % 7 + 1},"
+        f"{i % 13 + 0.25},{(i % 7 + 1) * (i % 13 + 0.25)},{regions[i % 4]}\n"
+        for i in range(num_rows)
+    ]
+    write_csv(path, rows + list(extra_rows))
+
+def assert_same_reports(streamed, in_memory):
+    assert streamed.keys() == in_memory.keys()
+    for name in in_memory:
+        pd.testing.assert_frame_equal(
+            streamed[name].reset_index(drop=True), in_memory[name].reset_index(drop=True),
+            check_dtype=False, check_categorical=False, check_index_type=False
+        )
+
+def test_chunked_aggregation_matches_in_memory(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_large_csv(csv_path, 3000, extra_rows=["01,2024-02-01,P1,Product1,Toys,2,1.25,2.50,North\n"])
+
+    in_memory = report_generator.aggregate_sales_data(
+        report_generator.clean_and_process_data(report_generator.load_sales_data(str(csv_path)))
+    )
+    chunks = report_generator.load_sales_data_in_chunks(str(csv_path), block_size=16 * 1024)
+    cleaned = [report_generator.clean_and_process_data(chunk) for chunk in chunks]
+    assert len(cleaned) > 1
+    assert_same_reports(report_generator.aggregate_sales_chunks(cleaned), in_memory)
+    # "01" is transaction 1, as in the strict in-memory read
+    assert in_memory["Summary"]["Value"][2] == 3000
+
+def test_chunked_aggregation_restarts_leniently_on_malformed_values(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_large_csv(csv_path, 3000, extra_rows=["3000,2024-02-01,P1,Product1,Toys,oops,1.25,2.50,North\n"])
+
+    in_memory = report_generator.aggregate_sales_data(
+        report_generator.clean_and_process_data(report_generator.load_sales_data(str(csv_path)))
+    )
+    streamed = report_generator.aggregate_sales_file_in_chunks(str(csv_path), block_size=16 * 1024)
+    assert_same_reports(streamed, in_memory)
+    assert in_memory["Summary"]["Value"][2] == 3001
+
+def test_fractional_quantities_and_us_dates_read_strictly(tmp_path, caplog):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, [
+        "1,07/19/2025,P1,Widget,Tools,1.5,10.00,15.00,North\n",
+        "2,2025-07-20,P2,Gadget,Toys,2,5.00,10.00,South\n",
+    ])
+    with caplog.at_level("WARNING"):
+        df = report_generator.clean_and_process_data(report_generator.load_sales_data(str(csv_path)))
+    assert "Malformed" not in caplog.text
+    assert df["TransactionID"].tolist() == [1, 2]
+    assert df["Quantity"].tolist() == [1.5, 2.0]
+    assert df["Date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-07-19", "2025-07-20"]
+
+def test_cache_from_older_cleaning_code_is_rebuilt(tmp_path, monkeypatch):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    monkeypatch.setattr(report_generator, "CACHE_VERSION", report_generator.CACHE_VERSION + 1)
+    parsed = []
+    read_sales_csv = report_generator.read_sales_csv
+    def spy(file_path, header, offset=0, end=None):
+        parsed.append(offset)
+        return read_sales_csv(file_path, header, offset, end)
+    monkeypatch.setattr(report_generator, "read_sales_csv", spy)
+
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert parsed == [0] # Full re-read, not the cached frame or an incremental read
+
+def test_appended_malformed_row_keeps_integer_ids(tmp_path):
+    csv_path = tmp_path / "sales.csv"
+    write_csv(csv_path, ROWS)
+    load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.write("3,2024-01-03,P1,Widget,Tools,oops,10.00,40.00,East\n")
+    df = load_cleaned_sales_data(str(csv_path), str(tmp_path / "cache"))
+    assert df["TransactionID"].tolist() == [1, 2, 3]
+    assert not pd.api.types.is_string_dtype(df["TransactionID"])
+
+def test_cache_fingerprint_is_stable_across_processes():
+    # A fingerprint that changed between runs would rebuild the cache every time
+    import subprocess, sys
+    code = "import report_generator; print(report_generator.cache_fingerprint())"
+    repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    other = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=repo_dir)
+    assert other.stdout.strip() == report_generator.cache_fingerprint()